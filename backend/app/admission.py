@@ -0,0 +1,170 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .config import settings
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """Concurrency limit with a bounded FIFO wait queue and AIMD adaptation.
+
+    Completions faster than target_ms grow the limit by ~1 per limit-worth of requests;
+    slower ones shrink it by 10% (at most once per cooldown) so the queue sheds load
+    before requests pile up on the DB pool.
+    """
+
+    _DECREASE_COOLDOWN_S = 0.5
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int, target_ms: float):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_ms = target_ms
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.latency_ewma_ms: float | None = None
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+
+    def _capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _retry_after(self) -> int:
+        latency_s = (self.latency_ewma_ms or self.target_ms) / 1000
+        drain_s = latency_s * (len(self._waiters) + 1) / self._capacity()
+        return max(1, min(30, math.ceil(drain_s)))
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self._capacity():
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.inflight += 1
+            fut.set_result(None)
+
+    async def acquire(self, max_wait_s: float, max_queue: int) -> None:
+        if self.inflight < self._capacity() and not self._waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue_full", self._retry_after())
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.queued_total += 1
+        try:
+            await asyncio.wait_for(fut, timeout=max_wait_s)
+        except asyncio.TimeoutError:
+            # The slot can be handed over in the same loop iteration the deadline fires.
+            if not fut.done() or fut.cancelled():
+                self.rejected_deadline += 1
+                raise AdmissionRejected("deadline", self._retry_after()) from None
+        except asyncio.CancelledError:
+            # Slot may have been handed over right before the client went away.
+            if fut.done() and not fut.cancelled():
+                self.release(None)
+            raise
+        finally:
+            if not fut.done() or fut.cancelled():
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+        self.admitted += 1
+
+    def release(self, latency_ms: float | None) -> None:
+        self.inflight -= 1
+        if latency_ms is not None:
+            self._observe(latency_ms)
+        self._wake()
+
+    def _observe(self, latency_ms: float) -> None:
+        prev = self.latency_ewma_ms
+        self.latency_ewma_ms = latency_ms if prev is None else prev * 0.9 + latency_ms * 0.1
+        if latency_ms <= self.target_ms:
+            self.limit = min(self.max_limit, self.limit + 1 / max(1.0, self.limit))
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self._DECREASE_COOLDOWN_S:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+            self._last_decrease = now
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "target_ms": self.target_ms,
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2) if self.latency_ewma_ms is not None else None,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline,
+        }
+
+
+# Max limits of the DB-bound groups (submit 11 + admin 3 + export 1) add up to the default SQLAlchemy
+# pool (5 + 10 overflow), which they share without a replica, so waiting happens here and not in the pool.
+limiters: dict[str, AdaptiveLimiter] = {
+    "submit": AdaptiveLimiter("submit", initial=8, min_limit=2, max_limit=11, target_ms=500),
+    "draft_write": AdaptiveLimiter("draft_write", initial=32, min_limit=4, max_limit=128, target_ms=200),
+    "admin": AdaptiveLimiter("admin", initial=2, min_limit=1, max_limit=3, target_ms=2000),
+    "export": AdaptiveLimiter("export", initial=1, min_limit=1, max_limit=1, target_ms=30000),
+}
+
+_routes: dict[tuple[str, str], str] = {
+    ("POST", "/api/submit"): "submit",
+    ("PUT", "/api/draft"): "draft_write",
+    ("GET", "/api/admin/stats"): "admin",
+    ("GET", "/api/admin/registrations"): "admin",
+    ("GET", "/api/admin/registrations/export"): "export",
+}
+
+
+def admission_stats() -> dict[str, Any]:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+async def admission_middleware(request: Request, call_next):
+    group = _routes.get((request.method, request.url.path)) if settings.admission_enabled else None
+    if group is None:
+        return await call_next(request)
+
+    limiter = limiters[group]
+    try:
+        await limiter.acquire(settings.admission_max_wait_seconds, settings.admission_max_queue)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Сервер перегружен, попробуйте позже", "reason": e.reason},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    started = time.perf_counter()
+    latency_ms: float | None = None
+    try:
+        response = await call_next(request)
+        latency_ms = (time.perf_counter() - started) * 1000
+        return response
+    finally:
+        limiter.release(latency_ms)
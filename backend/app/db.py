@@ -1,14 +1,23 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy import DateTime, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from .config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -35,6 +44,140 @@ class Registration(Base):
 engine: AsyncEngine = create_async_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+# Read-only REPEATABLE READ sessions (one snapshot per request) for admin reads and the export.
+# Without READ_DATABASE_URL they share the primary pool; with it they go to the replica while its lag is acceptable.
+_primary_read_engine: AsyncEngine = engine.execution_options(
+    isolation_level="REPEATABLE READ", postgresql_readonly=True
+)
+replica_engine: AsyncEngine | None = (
+    create_async_engine(
+        settings.read_database_url,
+        pool_pre_ping=True,
+        # Fail fast on a dead or hung replica so reads fall back instead of hanging.
+        connect_args={
+            "timeout": settings.replica_connect_timeout_seconds,
+            "command_timeout": settings.replica_command_timeout_seconds,
+        },
+        execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True},
+    )
+    if settings.read_database_url.strip()
+    else None
+)
+_PrimaryReadSessionLocal = async_sessionmaker(_primary_read_engine, expire_on_commit=False)
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine is not None else None
+)
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+_replica_state: dict[str, Any] = {"checked_at": 0.0, "lag_seconds": None, "fallbacks": 0}
+_replica_lag_lock = asyncio.Lock()
+
+
+async def _query_replica_lag() -> float:
+    async with replica_engine.connect() as conn:
+        return float((await conn.execute(_REPLICA_LAG_SQL)).scalar_one() or 0.0)
+
+
+async def _replica_lag_seconds() -> float | None:
+    """Lag of the replica in seconds, cached for replica_lag_check_interval_seconds; None if unreachable."""
+    if replica_engine is None:
+        return None
+    if time.monotonic() - _replica_state["checked_at"] < settings.replica_lag_check_interval_seconds:
+        return _replica_state["lag_seconds"]
+    async with _replica_lag_lock:
+        # Another caller may have refreshed it while we waited for the lock.
+        if time.monotonic() - _replica_state["checked_at"] < settings.replica_lag_check_interval_seconds:
+            return _replica_state["lag_seconds"]
+        try:
+            lag = await asyncio.wait_for(_query_replica_lag(), timeout=settings.replica_connect_timeout_seconds)
+        except Exception:
+            logger.warning("Replica lag check failed, reads fall back to primary", exc_info=True)
+            lag = None
+        _replica_state["checked_at"] = time.monotonic()
+        _replica_state["lag_seconds"] = lag
+        return lag
+
+
+def _mark_replica_down() -> None:
+    _replica_state["checked_at"] = time.monotonic()
+    _replica_state["lag_seconds"] = None
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Read-only session: replica if configured and not lagging, otherwise primary."""
+    if ReplicaSessionLocal is not None:
+        lag = await _replica_lag_seconds()
+        if lag is not None and lag <= settings.replica_max_lag_seconds:
+            session = ReplicaSessionLocal()
+            try:
+                # Connect up front so a replica that died since the last lag check falls back here
+                # instead of failing the request on its first query.
+                await asyncio.wait_for(session.connection(), timeout=settings.replica_connect_timeout_seconds)
+            except (OSError, DBAPIError, asyncio.TimeoutError):
+                await session.close()
+                logger.warning("Replica connection failed, reads fall back to primary", exc_info=True)
+                _mark_replica_down()
+            else:
+                async with session:
+                    yield session
+                return
+        _replica_state["fallbacks"] += 1
+    async with _PrimaryReadSessionLocal() as session:
+        yield session
+
+
+def _pool_stats(e: AsyncEngine) -> dict[str, Any]:
+    pool = e.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def db_pool_stats() -> dict[str, Any]:
+    return {
+        "primary": _pool_stats(engine),
+        "replica": (
+            {
+                **_pool_stats(replica_engine),
+                "lag_seconds": _replica_state["lag_seconds"],
+                "max_lag_seconds": settings.replica_max_lag_seconds,
+                "fallbacks_to_primary": _replica_state["fallbacks"],
+            }
+            if replica_engine is not None
+            else None
+        ),
+    }
+
+
+async def _warm_engine(e: AsyncEngine, connections: int) -> None:
+    async def _one():
+        async with e.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(*(_one() for _ in range(connections)))
+    except Exception:
+        logger.warning("Failed to warm DB pool for %s", e.url.render_as_string(hide_password=True), exc_info=True)
+
+
+async def warm_pools() -> None:
+    """Open pool connections to the primary (and replica) concurrently before the first request."""
+    n = max(0, settings.db_pool_warm_connections)
+    if n == 0:
+        return
+    engines = [engine] + ([replica_engine] if replica_engine is not None else [])
+    await asyncio.gather(*(_warm_engine(e, n) for e in engines))
+
 
 async def init_db():
     async with engine.begin() as conn:
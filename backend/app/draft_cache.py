@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from itertools import count
+from typing import Any
+
+from .config import settings
+from .redis_client import redis
+from .schemas import DraftPayload
+
+
+logger = logging.getLogger(__name__)
+
+
+class DraftCache:
+    """Per-worker LRU/TTL cache in front of the draft:{id} keys.
+
+    Writers publish the key to an invalidation channel; every other worker evicts it on receipt.
+    While the subscription is down invalidations may be missed, so fresh hits are disabled and the
+    entries are only used as a fallback for failed Redis reads; they are dropped on resubscribe.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, channel: str):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._entries: OrderedDict[str, tuple[float, DraftPayload]] = OrderedDict()
+        # key -> unique stamp of its last invalidation; bounded, oldest stamps are dropped first.
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._version_counter = count(1)
+        self._listening = False
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.invalidations_received = 0
+        self.last_invalidation_lag_ms: float | None = None
+        self.max_invalidation_lag_ms = 0.0
+        self._lag_total_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._listening and self.max_size > 0
+
+    def _lookup(self, key: str, allow_stale: bool = False) -> DraftPayload | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.monotonic() and not allow_stale:
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def _store(self, key: str, payload: DraftPayload) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _evict(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._versions[key] = next(self._version_counter)
+        self._versions.move_to_end(key)
+        while len(self._versions) > 4 * max(1, self.max_size):
+            self._versions.popitem(last=False)
+
+    async def get(self, key: str) -> DraftPayload | None:
+        if self.enabled:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        self.misses += 1
+
+        version = self._versions.get(key)
+        try:
+            raw = await redis.get(key)
+        except Exception:
+            # Redis blip: an expired local copy is better than losing the user's draft on screen.
+            stale = self._lookup(key, allow_stale=True)
+            if stale is not None:
+                self.stale_served += 1
+                logger.warning("Redis unavailable, serving stale draft for %s", key)
+                return stale
+            raise
+        if not raw:
+            return None
+        try:
+            payload = DraftPayload.model_validate(json.loads(raw))
+        except Exception:
+            return None
+        # Skip caching if this key was invalidated while we were reading; the value may already be old.
+        if self.enabled and version == self._versions.get(key):
+            self._store(key, payload)
+        return payload
+
+    async def put(self, key: str, payload: DraftPayload, ex: int) -> None:
+        await redis.set(key, payload.model_dump_json(), ex=ex)
+        self._evict(key)
+        if self.enabled:
+            self._store(key, payload)
+        await self._publish(key)
+
+    async def delete(self, key: str) -> None:
+        self._evict(key)
+        await redis.delete(key)
+        await self._publish(key)
+
+    async def _publish(self, key: str) -> None:
+        message = json.dumps({"key": key, "origin": self.origin, "ts": time.time()})
+        try:
+            await redis.publish(self.channel, message)
+        except Exception:
+            logger.warning("Failed to publish draft invalidation for %s", key, exc_info=True)
+
+    def _on_invalidation(self, data: str) -> None:
+        msg = json.loads(data)
+        if not isinstance(msg, dict):
+            raise ValueError("invalidation message is not an object")
+        if msg.get("origin") == self.origin:
+            return
+        self._evict(msg["key"])
+        self.invalidations_received += 1
+        lag_ms = max(0.0, (time.time() - float(msg.get("ts", 0))) * 1000)
+        self.last_invalidation_lag_ms = round(lag_ms, 2)
+        self.max_invalidation_lag_ms = max(self.max_invalidation_lag_ms, lag_ms)
+        self._lag_total_ms += lag_ms
+
+    async def listen(self) -> None:
+        delay = 0.5
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._entries.clear()
+                    self._listening = True
+                    delay = 0.5
+                    async for msg in pubsub.listen():
+                        if msg.get("type") != "message":
+                            continue
+                        try:
+                            self._on_invalidation(msg["data"])
+                        except (ValueError, KeyError, TypeError):
+                            logger.warning("Malformed draft invalidation: %r", msg.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Draft invalidation subscription lost, retrying in %.1fs", delay, exc_info=True)
+            finally:
+                self._listening = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stale_served": self.stale_served,
+            "invalidations_received": self.invalidations_received,
+            "last_invalidation_lag_ms": self.last_invalidation_lag_ms,
+            "max_invalidation_lag_ms": round(self.max_invalidation_lag_ms, 2),
+            "avg_invalidation_lag_ms": (
+                round(self._lag_total_ms / self.invalidations_received, 2) if self.invalidations_received else None
+            ),
+        }
+
+
+draft_cache = DraftCache(
+    max_size=settings.draft_cache_size,
+    ttl_seconds=settings.draft_cache_ttl_seconds,
+    channel=settings.draft_invalidation_channel,
+)
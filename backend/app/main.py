@@ -1,25 +1,38 @@
+import asyncio
 import io
-import json
 import logging
+from datetime import timedelta
 from typing import Any
 
-import httpx
-from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Response
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
 from sqlalchemy import String, cast, desc, func, insert, or_, select
 
+from .admission import admission_middleware, admission_stats
 from .config import settings
-from .db import Registration, SessionLocal, init_db
+from .db import Registration, SessionLocal, db_pool_stats, engine, init_db, read_session, replica_engine, warm_pools
+from .draft_cache import draft_cache
+from .profiling import (
+    instrument_engine,
+    is_debug_request,
+    profiling_middleware,
+    sampler,
+    slow_recorder_enabled,
+    slow_requests,
+)
 from .redis_client import redis
 from .schemas import DraftPayload, DraftResponse, Discipline, RegistrationMode
+from .stats_digest import flush as flush_stats_deltas, record_registration, run_publisher as run_stats_publisher
 from .telegram_auth import TelegramWebAppUser, verify_telegram_init_data
 
 
 app = FastAPI(title="FCL Mini App API")
 logger = logging.getLogger(__name__)
 
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(admission_middleware)
+# Added last so it wraps the others and 503/profile responses still carry CORS headers.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[o.strip() for o in settings.cors_origins.split(",") if o.strip()],
@@ -28,6 +41,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if slow_recorder_enabled():
+    instrument_engine(engine)
+    if replica_engine is not None:
+        instrument_engine(replica_engine)
+
 
 async def get_tg_user(x_telegram_init_data: str | None = Header(default=None)) -> TelegramWebAppUser:
     if not x_telegram_init_data:
@@ -99,20 +117,55 @@ def _build_submission_message(payload: DraftPayload) -> str:
     return "\n".join(lines)
 
 
+_telegram_client: Any = None
+_background_tasks: list[asyncio.Task] = []
+
+
+def _get_telegram_client():
+    # httpx is imported on the first notification, not at startup.
+    global _telegram_client
+    if _telegram_client is None:
+        import httpx
+
+        _telegram_client = httpx.AsyncClient(timeout=10.0)
+    return _telegram_client
+
+
 async def _send_telegram_notification(chat_id: int, text: str):
     url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            res = await client.post(url, json={"chat_id": chat_id, "text": text, "disable_web_page_preview": True})
-            if not res.is_success:
-                logger.warning("Telegram sendMessage failed: chat_id=%s status=%s body=%s", chat_id, res.status_code, res.text)
+        client = _get_telegram_client()
+        res = await client.post(url, json={"chat_id": chat_id, "text": text, "disable_web_page_preview": True})
+        if not res.is_success:
+            logger.warning("Telegram sendMessage failed: chat_id=%s status=%s body=%s", chat_id, res.status_code, res.text)
     except Exception:
         logger.exception("Failed to send Telegram notification to chat_id=%s", chat_id)
 
 
 @app.on_event("startup")
 async def _startup():
-    await init_db()
+    if slow_recorder_enabled():
+        sampler.start()
+    await asyncio.gather(init_db(), warm_pools(), _warm_redis())
+    _background_tasks.append(asyncio.create_task(run_stats_publisher()))
+    _background_tasks.append(asyncio.create_task(draft_cache.listen()))
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    sampler.stop()
+    for task in _background_tasks:
+        task.cancel()
+    await flush_stats_deltas()
+    if _telegram_client is not None:
+        await _telegram_client.aclose()
+
+
+async def _warm_redis():
+    try:
+        await redis.ping()
+    except Exception:
+        logger.warning("Redis is not reachable at startup", exc_info=True)
 
 
 @app.get("/api/health")
@@ -122,14 +175,7 @@ async def health():
 
 @app.get("/api/draft", response_model=DraftResponse)
 async def get_draft(user: TelegramWebAppUser = Depends(get_tg_user)):
-    raw = await redis.get(_draft_key(user.id))
-    if not raw:
-        return DraftResponse(draft=None)
-    try:
-        payload = DraftPayload.model_validate(json.loads(raw))
-    except Exception:
-        return DraftResponse(draft=None)
-    return DraftResponse(draft=payload)
+    return DraftResponse(draft=await draft_cache.get(_draft_key(user.id)))
 
 
 @app.put("/api/draft", status_code=204)
@@ -157,7 +203,7 @@ async def put_draft(draft: DraftPayload, user: TelegramWebAppUser = Depends(get_
             data=draft.data or {},
         )
 
-    await redis.set(_draft_key(user.id), normalized.model_dump_json(), ex=settings.draft_ttl_seconds)
+    await draft_cache.put(_draft_key(user.id), normalized, ex=settings.draft_ttl_seconds)
     return Response(status_code=204)
 
 
@@ -198,30 +244,58 @@ async def submit(
     ).model_dump()
 
     async with SessionLocal() as session:
-        await session.execute(
-            insert(Registration).values(
-                tg_user_id=user.id,
-                tg_username=user.username,
-                tg_first_name=user.first_name,
-                tg_last_name=user.last_name,
-                discipline=draft.discipline.value,
-                mode=draft.mode.value,
-                payload=payload,
-                source_init_data=x_telegram_init_data,
+        created = (
+            await session.execute(
+                insert(Registration)
+                .values(
+                    tg_user_id=user.id,
+                    tg_username=user.username,
+                    tg_first_name=user.first_name,
+                    tg_last_name=user.last_name,
+                    discipline=draft.discipline.value,
+                    mode=draft.mode.value,
+                    payload=payload,
+                    source_init_data=x_telegram_init_data,
+                )
+                .returning(Registration.id, Registration.submitted_at)
             )
-        )
+        ).one()
         await session.commit()
 
+    record_registration(
+        {
+            "id": created.id,
+            "discipline": draft.discipline.value,
+            "mode": draft.mode.value,
+            "tg_username": user.username,
+            "submitted_at": created.submitted_at.isoformat() if created.submitted_at else None,
+        }
+    )
+
     message = _build_submission_message(draft)
     background_tasks.add_task(_send_telegram_notification, user.id, message)
 
-    await redis.delete(_draft_key(user.id))
+    await draft_cache.delete(_draft_key(user.id))
     return Response(status_code=204)
 
 
 @app.get("/api/admin/stats")
-async def admin_stats():
-    async with SessionLocal() as session:
+async def admin_stats(ids_window_seconds: int | None = None):
+    async with read_session() as session:
+        # Read sessions are REPEATABLE READ, so the ids below and the counts come from one snapshot;
+        # the bot reconciles its delta stream against them.
+        ids = (
+            (
+                await session.execute(
+                    select(Registration.id).where(
+                        Registration.submitted_at
+                        >= func.now() - timedelta(seconds=min(max(ids_window_seconds, 0), 3600))
+                    )
+                )
+            ).scalars().all()
+            if ids_window_seconds is not None
+            else None
+        )
         total = (await session.execute(select(func.count()).select_from(Registration))).scalar_one()
         unique_users = (await session.execute(select(func.count(func.distinct(Registration.tg_user_id))))).scalar_one()
 
@@ -266,6 +340,32 @@ async def admin_stats():
             }
             for r in recent_rows
         ],
+        **({"ids": list(ids)} if ids is not None else {}),
+    }
+
+
+@app.get("/api/admin/db/pools")
+async def admin_db_pools():
+    return db_pool_stats()
+
+
+@app.get("/api/admin/admission")
+async def admin_admission():
+    return admission_stats()
+
+
+@app.get("/api/admin/cache/drafts")
+async def admin_draft_cache():
+    return draft_cache.stats()
+
+
+@app.get("/api/admin/debug/slow")
+async def admin_debug_slow(request: Request):
+    if not is_debug_request(request):
+        raise HTTPException(status_code=403, detail="Invalid X-Debug-Token")
+    return {
+        "threshold_ms": settings.slow_request_threshold_ms,
+        "items": list(reversed(slow_requests)),
     }
 
 
@@ -280,7 +380,7 @@ async def admin_registrations(
     safe_limit = max(1, min(limit, 100))
     safe_offset = max(0, offset)
 
-    async with SessionLocal() as session:
+    async with read_session() as session:
         query = select(Registration)
         count_query = select(func.count()).select_from(Registration)
 
@@ -330,116 +430,9 @@ async def admin_registrations(
     }
 
 
-def _safe_str(v: Any) -> str:
-    if v is None:
-        return ""
-    s = str(v).strip()
-    return s if s else ""
-
-
-def _build_excel_export(rows: list) -> bytes:
-    wb = Workbook()
-    wb.remove(wb.active)
-
-    by_sheet: dict[str, list] = {}
-    for r in rows:
-        key = f"{r.discipline}_{r.mode}"
-        if key not in by_sheet:
-            by_sheet[key] = []
-        by_sheet[key].append(r)
-
-    for sheet_name, regs in sorted(by_sheet.items()):
-        ws = wb.create_sheet(title=sheet_name[:31])
-
-        if regs and regs[0].mode == "team":
-            headers = [
-                "ID", "TG User ID", "TG Username", "Дата заявки", "Название команды",
-                "Игрок 1 (ФИО)", "Ник", "Steam", "Faceit", "Факультет", "TG",
-                "Игрок 2 (ФИО)", "Ник", "Steam", "Faceit", "Факультет", "TG",
-                "Игрок 3 (ФИО)", "Ник", "Steam", "Faceit", "Факультет", "TG",
-                "Игрок 4 (ФИО)", "Ник", "Steam", "Faceit", "Факультет", "TG",
-                "Игрок 5 (ФИО)", "Ник", "Steam", "Faceit", "Факультет", "TG",
-                "Запас 1", "Запас 2", "Запас 3",
-            ]
-            ws.append(headers)
-            for r in regs:
-                data = r.payload or {}
-                inner = data.get("data", data)
-                if not isinstance(inner, dict):
-                    inner = {}
-                players = inner.get("team_players") or []
-                if not isinstance(players, list):
-                    players = []
-                team_name = _safe_str(inner.get("team_name"))
-                row = [
-                    r.id,
-                    r.tg_user_id,
-                    _safe_str(r.tg_username),
-                    (r.submitted_at.isoformat()[:19] if r.submitted_at else ""),
-                    team_name,
-                ]
-                for i in range(8):
-                    p = players[i] if i < len(players) and isinstance(players[i], dict) else {}
-                    if i < 5:
-                        row.extend([
-                            _safe_str(p.get("full_name")),
-                            _safe_str(p.get("game_nick")),
-                            _safe_str(p.get("steam_url")),
-                            _safe_str(p.get("faceit_url")),
-                            _safe_str(p.get("faculty")) or _safe_str(p.get("faculty_other")),
-                            _safe_str(p.get("telegram")),
-                        ])
-                    else:
-                        row.append(_safe_str(p.get("full_name")) + " | " + _safe_str(p.get("game_nick")))
-                ws.append(row)
-        elif regs and getattr(regs[0], "discipline", None) == "GUEST":
-            headers = ["ID", "TG User ID", "TG Username", "Дата заявки", "ФИО", "Telegram", "Факультет"]
-            ws.append(headers)
-            for r in regs:
-                data = r.payload or {}
-                inner = data.get("data", data)
-                if not isinstance(inner, dict):
-                    inner = {}
-                fac = _safe_str(inner.get("faculty"))
-                if fac == "Другое":
-                    fac = _safe_str(inner.get("faculty_other")) or fac
-                row = [
-                    r.id,
-                    r.tg_user_id,
-                    _safe_str(r.tg_username),
-                    (r.submitted_at.isoformat()[:19] if r.submitted_at else ""),
-                    _safe_str(inner.get("full_name")),
-                    _safe_str(inner.get("telegram")),
-                    fac,
-                ]
-                ws.append(row)
-        else:
-            headers = ["ID", "TG User ID", "TG Username", "Дата заявки", "ФИО", "Ник", "Telegram"]
-            ws.append(headers)
-            for r in regs:
-                data = r.payload or {}
-                inner = data.get("data", data)
-                if not isinstance(inner, dict):
-                    inner = {}
-                row = [
-                    r.id,
-                    r.tg_user_id,
-                    _safe_str(r.tg_username),
-                    (r.submitted_at.isoformat()[:19] if r.submitted_at else ""),
-                    _safe_str(inner.get("full_name")),
-                    _safe_str(inner.get("game_nick")),
-                    _safe_str(inner.get("telegram")),
-                ]
-                ws.append(row)
-
-    buf = io.BytesIO()
-    wb.save(buf)
-    return buf.getvalue()
-
-
 @app.get("/api/admin/registrations/export")
 async def admin_registrations_export():
-    async with SessionLocal() as session:
+    async with read_session() as session:
         rows = (
             await session.execute(
                 select(Registration)
@@ -450,7 +443,9 @@ async def admin_registrations_export():
     if not rows:
         raise HTTPException(status_code=404, detail="Нет заявок для экспорта")
 
-    excel_bytes = _build_excel_export(rows)
+    from .export import build_excel_export
+
+    excel_bytes = build_excel_export(rows)
     filename = "registrations.xlsx"
     return StreamingResponse(
         io.BytesIO(excel_bytes),
@@ -0,0 +1,151 @@
+import hmac
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import settings
+
+
+_sql_timings: ContextVar[list[dict[str, Any]] | None] = ContextVar("sql_timings", default=None)
+
+slow_requests: deque[dict[str, Any]] = deque(maxlen=max(1, settings.slow_request_buffer_size))
+
+
+def is_debug_request(request: Request) -> bool:
+    token = settings.debug_token
+    if not token:
+        return False
+    given = request.headers.get("x-debug-token") or ""
+    return hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8"))
+
+
+def slow_recorder_enabled() -> bool:
+    # Separate opt-in: SLOW_REQUEST_THRESHOLD_MS defaults to 0, and without DEBUG_TOKEN nobody can read the buffer.
+    return bool(settings.debug_token) and settings.slow_request_threshold_ms > 0
+
+
+def _profile_requested(request: Request) -> bool:
+    return request.headers.get("x-profile") == "1" or request.query_params.get("__profile") == "1"
+
+
+class _StackSampler:
+    """Samples the event-loop thread's stack while requests are in flight.
+
+    Samples are kept in a bounded deque and sliced by time when a request turns out to be slow,
+    so concurrent requests share samples — good enough to see where the loop was busy.
+    """
+
+    def __init__(self, interval_s: float, max_samples: int):
+        self.interval_s = interval_s
+        self.samples: deque[tuple[float, tuple[str, ...]]] = deque(maxlen=max_samples)
+        self.in_flight = 0
+        self._thread_id: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            if self.in_flight <= 0:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((time.perf_counter(), tuple(stack)))
+
+    def folded(self, start: float, end: float) -> list[str]:
+        """Collapsed stacks ("a;b;c count") for samples within [start, end], flamegraph.pl compatible."""
+        counts = Counter(stack for t, stack in list(self.samples) if start <= t <= end)
+        return [f"{';'.join(stack)} {n}" for stack, n in counts.most_common()]
+
+
+sampler = _StackSampler(
+    interval_s=max(0.001, settings.profiler_sample_interval_ms / 1000),
+    max_samples=10_000,
+)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    # The start time lives on the per-execution context, so a failed statement leaves nothing behind.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._profiling_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profiling_started", None)
+        timings = _sql_timings.get()
+        if timings is not None and started is not None:
+            timings.append({"sql": statement[:500], "ms": round((time.perf_counter() - started) * 1000, 2)})
+
+
+async def profiling_middleware(request: Request, call_next):
+    if _profile_requested(request) and is_debug_request(request):
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=sampler.interval_s, async_mode="enabled")
+        profiler.start()
+        try:
+            await call_next(request)
+        finally:
+            profiler.stop()
+        return HTMLResponse(profiler.output_html())
+
+    if not slow_recorder_enabled():
+        return await call_next(request)
+    threshold_ms = settings.slow_request_threshold_ms
+
+    timings: list[dict[str, Any]] = []
+    token = _sql_timings.set(timings)
+    sampler.in_flight += 1
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        finished = time.perf_counter()
+        sampler.in_flight -= 1
+        _sql_timings.reset(token)
+
+    elapsed_ms = (finished - started) * 1000
+    if elapsed_ms >= threshold_ms:
+        slow_requests.append(
+            {
+                "at": time.time(),
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round(elapsed_ms, 2),
+                "sql": timings,
+                "sql_total_ms": round(sum(t["ms"] for t in timings), 2),
+                "stacks": sampler.folded(started, finished),
+            }
+        )
+    return response
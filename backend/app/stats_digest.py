@@ -0,0 +1,37 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+from .config import settings
+from .redis_client import redis
+
+
+logger = logging.getLogger(__name__)
+
+# Registrations committed by this worker since the last tick. The bot sums deltas across workers and
+# matches their ids against the ids returned with its /api/admin/stats snapshot.
+_pending: list[dict[str, Any]] = []
+
+
+def record_registration(item: dict[str, Any]) -> None:
+    _pending.append(item)
+
+
+async def flush() -> None:
+    if not _pending:
+        return
+    items = sorted(_pending, key=lambda i: i["id"], reverse=True)
+    _pending.clear()
+    message = {"ts": time.time(), "items": items}
+    try:
+        await redis.publish(settings.stats_channel, json.dumps(message, ensure_ascii=False))
+    except Exception:
+        logger.warning("Failed to publish stats delta (%s registrations)", len(items), exc_info=True)
+
+
+async def run_publisher() -> None:
+    while True:
+        await asyncio.sleep(settings.stats_tick_seconds)
+        await flush()
@@ -0,0 +1,118 @@
+"""Startup benchmark for the backend.
+
+Records `python -X importtime -c "import app.main"` and the time from launching uvicorn
+to the first successful `/api/health` response. Needs the same env as the app (DB and Redis reachable).
+
+    python scripts/startup_bench.py --out startup-bench
+    python scripts/startup_bench.py --max-import-ms 800 --max-health-ms 3000   # non-zero exit on regression
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_importtime(out_dir: Path) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    (out_dir / "importtime.txt").write_text(proc.stderr)
+    if proc.returncode != 0:
+        raise SystemExit(f"import app.main failed:\n{proc.stderr[-2000:]}")
+
+    top_level: list[tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:
+            top_level.append((m.group(4), int(m.group(2))))
+    total_us = sum(us for _, us in top_level)
+    top_level.sort(key=lambda x: x[1], reverse=True)
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "imports_ms": round(total_us / 1000, 1),
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in top_level[:15]],
+    }
+
+
+def measure_first_health(timeout_s: float) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            if proc.poll() is not None:
+                raise SystemExit(f"uvicorn exited with {proc.returncode}:\n{proc.stderr.read()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return {"first_health_ms": round((time.perf_counter() - started) * 1000, 1)}
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            time.sleep(0.02)
+        raise SystemExit(f"/api/health did not answer within {timeout_s}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="startup-bench", help="directory for importtime.txt and report.json")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-health-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    report = {"importtime": measure_importtime(out_dir), **measure_first_health(args.timeout)}
+    (out_dir / "report.json").write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failed = False
+    if args.max_import_ms is not None and report["importtime"]["imports_ms"] > args.max_import_ms:
+        print(f"REGRESSION: imports {report['importtime']['imports_ms']}ms > {args.max_import_ms}ms", file=sys.stderr)
+        failed = True
+    if args.max_health_ms is not None and report["first_health_ms"] > args.max_health_ms:
+        print(f"REGRESSION: first /api/health {report['first_health_ms']}ms > {args.max_health_ms}ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,15 @@ class Settings(BaseSettings):
     stats_api_url: str = "http://backend:8000/api/admin/stats"
     admin_user_ids: str = ""
 
+    redis_url: str = "redis://redis:6379/0"
+    stats_channel: str = "stats:deltas"
+    stats_digest_interval_seconds: int = 60 * 60
+    """Раз в сколько секунд слать сводку админам (если были новые заявки). 0 — не слать по таймеру."""
+    stats_digest_threshold: int = 20
+    """Слать сводку сразу, как только накопилось столько новых заявок. 0 — выключено."""
+    stats_digest_resync_seconds: int = 60 * 60
+    """Как часто сверять счётчики с /api/admin/stats."""
+
     @property
     def guest_webapp_url(self) -> str:
         if self.webapp_guest_url.strip():
@@ -0,0 +1,84 @@
+import time
+from collections import Counter, deque
+
+
+class StatsDigest:
+    """Статистика в памяти бота: снимок /api/admin/stats плюс дельты из Redis-канала бэкенда.
+
+    Снимок и дельты могут пересекаться в обе стороны: заявка попадает в снимок раньше своей дельты
+    (дельты уходят раз в тик), а снимок с реплики или с ещё не закоммиченными заявками может не
+    содержать уже применённых дельт. Поэтому снимок запрашивается вместе с id заявок за последние
+    SNAPSHOT_WINDOW_SECONDS, и сверка идёт по этим id, а не по одному порогу.
+    """
+
+    SNAPSHOT_WINDOW_SECONDS = 600
+    """Окно, за которое бэкенд отдаёт id заявок вместе со снимком."""
+    BUFFER_SECONDS = SNAPSHOT_WINDOW_SECONDS // 2
+    """Сколько помнить применённые дельты; с запасом меньше окна, чтобы все они были в списке id."""
+
+    def __init__(self, recent_limit: int = 8, buffer_limit: int = 5000):
+        self.recent_limit = recent_limit
+        self.total = 0
+        self.unique_users = 0
+        self.by_discipline: Counter[str] = Counter()
+        self.by_mode: Counter[str] = Counter()
+        self.recent: list[dict] = []
+        self.pending = 0
+        """Новых заявок с момента последней отправленной сводки."""
+        self._applied: deque[tuple[float, dict]] = deque(maxlen=buffer_limit)
+        self._snapshot_ids: set[int] = set()
+
+    def _count(self, items: list[dict]) -> None:
+        self.total += len(items)
+        for item in items:
+            self.by_discipline[item.get("discipline")] += 1
+            self.by_mode[item.get("mode")] += 1
+        known = {i.get("id") for i in self.recent}
+        merged = self.recent + [i for i in items if i.get("id") not in known]
+        self.recent = sorted(merged, key=lambda i: int(i.get("id") or 0), reverse=True)[: self.recent_limit]
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.BUFFER_SECONDS
+        while self._applied and self._applied[0][0] < cutoff:
+            self._applied.popleft()
+
+    def reset(self, snapshot: dict) -> None:
+        self.total = int(snapshot.get("total_registrations", 0) or 0)
+        self.unique_users = int(snapshot.get("unique_users", 0) or 0)
+        self.by_discipline = Counter(
+            {item.get("discipline"): int(item.get("count") or 0) for item in snapshot.get("by_discipline") or []}
+        )
+        self.by_mode = Counter({item.get("mode"): int(item.get("count") or 0) for item in snapshot.get("by_mode") or []})
+        self.recent = list(snapshot.get("recent") or [])[: self.recent_limit]
+        if "ids" not in snapshot:
+            # Снимок без id (старый бэкенд) — сверять не с чем, считаем его полным.
+            self._snapshot_ids = set()
+            return
+        self._snapshot_ids = {int(i) for i in snapshot["ids"]}
+        self._prune()
+        # Применённые дельты, которых снимок ещё не видит, возвращаем поверх него.
+        missing = [item for _, item in self._applied if int(item.get("id") or 0) not in self._snapshot_ids]
+        self._count(missing)
+
+    def apply(self, delta: dict) -> None:
+        items = delta.get("items") or []
+        now = time.monotonic()
+        self._prune()
+        fresh = []
+        for item in items:
+            self._applied.append((now, item))
+            # Заявка уже могла попасть в снимок раньше, чем бэкенд опубликовал её дельту.
+            if int(item.get("id") or 0) not in self._snapshot_ids:
+                fresh.append(item)
+        self.pending += len(items)
+        self._count(fresh)
+
+    def as_stats(self) -> dict:
+        """Тот же формат, что отдаёт /api/admin/stats — чтобы рендерить через _render_stats."""
+        return {
+            "total_registrations": self.total,
+            "unique_users": self.unique_users,
+            "by_discipline": [{"discipline": d, "count": c} for d, c in self.by_discipline.most_common()],
+            "by_mode": [{"mode": m, "count": c} for m, c in self.by_mode.most_common()],
+            "recent": self.recent,
+        }
@@ -1,6 +1,8 @@
 import asyncio
+import json
 import logging
 import sys
+import time
 
 import httpx
 from aiogram import Bot, Dispatcher, F
@@ -8,8 +10,10 @@ from aiogram.exceptions import TelegramNetworkError, TelegramUnauthorizedError
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from redis.asyncio import Redis
 
 from bot_config import settings
+from digest import StatsDigest
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +23,8 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 dp = Dispatcher()
+digest = StatsDigest()
+_STATS_PARAMS = {"ids_window_seconds": StatsDigest.SNAPSHOT_WINDOW_SECONDS}
 
 
 def _is_admin(message: Message) -> bool:
@@ -28,7 +34,7 @@ def _is_admin(message: Message) -> bool:
     return user_id in settings.parsed_admin_user_ids
 
 
-def _render_stats(data: dict) -> str:
+def _render_stats(data: dict, title: str = "Статистика регистраций", unique_note: str = "") -> str:
     total = data.get("total_registrations", 0)
     unique = data.get("unique_users", 0)
     by_discipline = data.get("by_discipline", []) or []
@@ -36,10 +42,10 @@ def _render_stats(data: dict) -> str:
     recent = data.get("recent", []) or []
 
     lines = [
-        "Статистика регистраций",
+        title,
         "",
         f"Всего заявок: {total}",
-        f"Уникальных пользователей: {unique}",
+        f"Уникальных пользователей: {unique}{unique_note}",
         "",
         "По дисциплинам:",
     ]
@@ -95,11 +101,12 @@ async def stats(message: Message):
         return
     try:
         async with httpx.AsyncClient(timeout=12.0) as client:
-            resp = await client.get(settings.stats_api_url)
+            resp = await client.get(settings.stats_api_url, params=_STATS_PARAMS)
         if resp.status_code != 200:
             await message.answer(f"Не удалось получить статистику: HTTP {resp.status_code}\n{resp.text[:300]}")
             return
         payload = resp.json()
+        digest.reset(payload)
         await message.answer(_render_stats(payload))
     except Exception as e:
         await message.answer(f"Ошибка запроса статистики: {e}")
@@ -137,10 +144,85 @@ async def _delete_webhook_with_retry(bot: Bot) -> None:
             delay = min(delay * 1.5, max_delay)
 
 
+async def _resync_digest() -> None:
+    try:
+        async with httpx.AsyncClient(timeout=12.0) as client:
+            resp = await client.get(settings.stats_api_url, params=_STATS_PARAMS)
+        resp.raise_for_status()
+        digest.reset(resp.json())
+    except Exception as e:
+        log.warning("Не удалось сверить статистику для сводок: %s", e)
+
+
+async def _listen_stats_deltas(redis: Redis) -> None:
+    """Слушаем дельты бэкенда; при обрыве Redis переподключаемся.
+
+    Сверка со снимком запускается после каждой подписки: так дельты, пришедшие пока снимок
+    читается, не теряются, а пропущенные во время обрыва подтягиваются снимком.
+    """
+    delay = 1.0
+    resync: asyncio.Task | None = None
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(settings.stats_channel)
+                delay = 1.0
+                if resync is None or resync.done():
+                    resync = asyncio.create_task(_resync_digest())
+                async for msg in pubsub.listen():
+                    if msg.get("type") != "message":
+                        continue
+                    try:
+                        digest.apply(json.loads(msg["data"]))
+                    except (ValueError, TypeError, AttributeError):
+                        log.warning("Некорректная дельта статистики: %r", msg.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Подписка на %s оборвалась: %s. Повтор через %.0f с.", settings.stats_channel, e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+
+async def _push_digests(bot: Bot) -> None:
+    interval = settings.stats_digest_interval_seconds
+    threshold = settings.stats_digest_threshold
+    last_push = last_sync = time.monotonic()
+    while True:
+        await asyncio.sleep(5)
+        now = time.monotonic()
+        if now - last_sync >= settings.stats_digest_resync_seconds:
+            await _resync_digest()
+            last_sync = now
+        if digest.pending <= 0:
+            continue
+        due_by_time = interval > 0 and now - last_push >= interval
+        due_by_threshold = threshold > 0 and digest.pending >= threshold
+        if not (due_by_time or due_by_threshold):
+            continue
+        text = _render_stats(
+            digest.as_stats(),
+            title=f"Сводка регистраций: +{digest.pending} новых",
+            unique_note=" (на момент последней сверки)",
+        )
+        digest.pending = 0
+        last_push = now
+        for admin_id in settings.parsed_admin_user_ids:
+            try:
+                await bot.send_message(admin_id, text)
+            except Exception as e:
+                log.warning("Не удалось отправить сводку admin_id=%s: %s", admin_id, e)
+
+
 async def main():
     bot = Bot(settings.bot_token)
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    tasks: list[asyncio.Task] = []
     try:
         await _delete_webhook_with_retry(bot)
+        if settings.parsed_admin_user_ids:
+            tasks.append(asyncio.create_task(_listen_stats_deltas(redis)))
+            tasks.append(asyncio.create_task(_push_digests(bot)))
         log.info(
             "Polling started; webapp participants=%s guests=%s",
             settings.webapp_url,
@@ -148,6 +230,9 @@ async def main():
         )
         await dp.start_polling(bot)
     finally:
+        for task in tasks:
+            task.cancel()
+        await redis.aclose()
         await bot.session.close()
 
 
@@ -0,0 +1,165 @@
+"""Build-stage optimization of static assets for the landing and the mini app.
+
+    pip install -r deploy/assets/requirements.txt
+
+    # WebP variants at responsive widths + optimized/manifest.json next to the sources
+    python deploy/assets/optimize_assets.py images fcl_lend/src/assets frontend/src/assets
+
+    # .br/.gz siblings for text assets of a finished Vite build (served by gzip_static/brotli_static)
+    python deploy/assets/optimize_assets.py precompress fcl_lend/dist frontend/dist
+
+Both commands print a before/after size report and write it to <dir>/optimized/report.json
+(images) or <dist>/precompress-report.json (precompress).
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+
+DEFAULT_WIDTHS = (480, 960, 1440, 1920)
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+TEXT_SUFFIXES = {".html", ".js", ".mjs", ".css", ".svg", ".json", ".txt", ".xml", ".ttf", ".otf", ".map"}
+MIN_COMPRESS_BYTES = 1024
+OUTPUT_DIR = "optimized"
+# Only WebP: the apps use plain <img srcset>, which cannot offer an AVIF source with a fallback.
+WEBP_OPTIONS = {"quality": 78, "method": 6}
+
+
+def _fmt_size(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.2f} MB"
+    return f"{n / 1024:.1f} KB"
+
+
+def _print_report(title: str, rows: list[tuple[str, int, int]]) -> dict:
+    before = sum(r[1] for r in rows)
+    after = sum(r[2] for r in rows)
+    print(f"\n{title}")
+    for name, b, a in rows:
+        print(f"  {name:<48} {_fmt_size(b):>10} -> {_fmt_size(a):>10}  ({(1 - a / b) * 100 if b else 0:5.1f}% saved)")
+    saved = (1 - after / before) * 100 if before else 0.0
+    print(f"  {'TOTAL':<48} {_fmt_size(before):>10} -> {_fmt_size(after):>10}  ({saved:5.1f}% saved)")
+    return {
+        "before_bytes": before,
+        "after_bytes": after,
+        "files": [{"file": n, "before_bytes": b, "after_bytes": a} for n, b, a in rows],
+    }
+
+
+def optimize_images(assets_dir: Path, widths: tuple[int, ...]) -> None:
+    from PIL import Image, features
+
+    if not features.check("webp"):
+        raise SystemExit("Pillow is built without WebP support")
+
+    out_dir = assets_dir / OUTPUT_DIR
+    out_dir.mkdir(exist_ok=True)
+    for stale in out_dir.glob("*.webp"):
+        stale.unlink()
+    manifest: dict[str, dict] = {}
+    rows: list[tuple[str, int, int]] = []
+
+    for src in sorted(p for p in assets_dir.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES):
+        if out_dir in src.parents:
+            continue
+        rel = src.relative_to(assets_dir).as_posix()
+        original_bytes = src.stat().st_size
+        with Image.open(src) as im:
+            im.load()
+            has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+            base = im.convert("RGBA" if has_alpha else "RGB")
+        stem = Path(rel).with_suffix("").as_posix().replace("/", "__")
+
+        # Never upscale. Walk from the widest down and keep a variant only if it is smaller than both the
+        # source and the next wider kept variant; otherwise a browser picking it would download more.
+        targets = sorted({w for w in widths if w < base.width} | {base.width}, reverse=True)
+        kept: list[dict] = []
+        ceiling = original_bytes
+        for w in targets:
+            h = round(base.height * w / base.width)
+            resized = base if w == base.width else base.resize((w, h), Image.Resampling.LANCZOS)
+            dst = out_dir / f"{stem}-{w}.webp"
+            resized.save(dst, format="WEBP", **WEBP_OPTIONS)
+            size = dst.stat().st_size
+            if size >= ceiling:
+                dst.unlink()
+                continue
+            kept.append({"src": dst.relative_to(assets_dir).as_posix(), "width": w, "bytes": size})
+            ceiling = size
+        kept.reverse()
+
+        if kept:
+            manifest[rel] = {"width": base.width, "height": base.height, "bytes": original_bytes, "webp": kept}
+        # Same choice as responsiveImage for the full-width candidate: the full-width WebP if it was kept,
+        # otherwise the original file.
+        full = kept[-1]["bytes"] if kept and kept[-1]["width"] == base.width else original_bytes
+        rows.append((rel, original_bytes, full))
+
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+    report = _print_report(f"Images: {assets_dir}", rows)
+    (out_dir / "report.json").write_text(json.dumps(report, indent=2) + "\n")
+
+
+def precompress(dist_dir: Path) -> None:
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("warning: brotli is not installed, writing only .gz", file=sys.stderr)
+
+    rows: list[tuple[str, int, int]] = []
+    for src in sorted(p for p in dist_dir.rglob("*") if p.is_file() and p.suffix.lower() in TEXT_SUFFIXES):
+        data = src.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        best = len(data)
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            src.with_name(src.name + ".gz").write_bytes(gz)
+            best = min(best, len(gz))
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                src.with_name(src.name + ".br").write_bytes(br)
+                best = min(best, len(br))
+        rows.append((src.relative_to(dist_dir).as_posix(), len(data), best))
+
+    report = _print_report(f"Precompressed: {dist_dir}", rows)
+    (dist_dir / "precompress-report.json").write_text(json.dumps(report, indent=2) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    images = sub.add_parser("images", help="generate WebP variants and a manifest")
+    images.add_argument("dirs", nargs="+", type=Path)
+    images.add_argument(
+        "--widths",
+        default=",".join(str(w) for w in DEFAULT_WIDTHS),
+        help="comma-separated target widths (default: %(default)s)",
+    )
+
+    pre = sub.add_parser("precompress", help="write .br/.gz next to text assets of a build")
+    pre.add_argument("dirs", nargs="+", type=Path)
+
+    args = parser.parse_args()
+    for d in args.dirs:
+        if not d.is_dir():
+            parser.error(f"not a directory: {d}")
+
+    if args.command == "images":
+        widths = tuple(int(w) for w in args.widths.split(",") if w.strip())
+        for d in args.dirs:
+            optimize_images(d, widths)
+    else:
+        for d in args.dirs:
+            precompress(d)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
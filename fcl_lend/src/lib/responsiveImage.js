@@ -0,0 +1,19 @@
+// Generated by deploy/assets/optimize_assets.py in the Docker build; absent in a plain `npm run dev`,
+// in which case images fall back to the original PNG.
+const manifests = import.meta.glob('@/assets/optimized/manifest.json', { eager: true, import: 'default' })
+const variantModules = import.meta.glob('@/assets/optimized/*.webp', { eager: true, query: '?url', import: 'default' })
+
+const manifest = Object.values(manifests)[0] ?? {}
+const urlByFile = new Map(Object.entries(variantModules).map(([path, url]) => [path.split('/').pop() ?? '', url]))
+
+export function responsiveImage(name, fallbackSrc) {
+  const entry = manifest[name]
+  const candidates = (entry?.webp ?? [])
+    .map((v) => ({ url: urlByFile.get(v.src.split('/').pop() ?? ''), width: v.width }))
+    .filter((c) => c.url)
+  if (!entry || !candidates.length) return { src: fallbackSrc }
+  // The optimizer drops variants that are not smaller than the source; then the original covers full width.
+  if (candidates[candidates.length - 1].width < entry.width) candidates.push({ url: fallbackSrc, width: entry.width })
+  const largest = candidates[candidates.length - 1]
+  return { src: largest.url, srcset: candidates.map((c) => `${c.url} ${c.width}w`).join(', ') }
+}